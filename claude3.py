@@ -1,293 +1,584 @@
+import asyncio
+import csv
+import functools
+import hashlib
+import json
 import requests
-import pandas as pd
 import numpy as np
 from PIL import Image
 from io import BytesIO
+import re
 import time
 import os
+from concurrent.futures import ProcessPoolExecutor
 from urllib.parse import urlparse
-from datetime import datetime
-import random
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from SPARQLWrapper import SPARQLWrapper, JSON
 
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    from aiolimiter import AsyncLimiter
+except ImportError:
+    AsyncLimiter = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # Needs both the Python wrapper and the native libjpeg-turbo library
+    from turbojpeg import TurboJPEG, TJPF_RGB
+    _turbojpeg = TurboJPEG()
+except Exception:
+    _turbojpeg = None
+
 # Create directories for saving data
 os.makedirs('images', exist_ok=True)
 os.makedirs('data', exist_ok=True)
 
-def run_wikidata_query(start_year, end_year, limit=100):
-    """Run a SPARQL query on WikiData to get European painting data with geospatial information"""
-    sparql = SPARQLWrapper("https://query.wikidata.org/sparql")
-    
-    query = f"""
+# On-disk image cache so reruns don't re-download anything
+_IMAGE_CACHE_DIR = os.path.join('cache', 'images')
+os.makedirs(_IMAGE_CACHE_DIR, exist_ok=True)
+
+def _image_cache_path(url):
+    return os.path.join(_IMAGE_CACHE_DIR, hashlib.sha1(url.encode()).hexdigest())
+
+def _image_cache_get(url):
+    path = _image_cache_path(url)
+    if os.path.exists(path):
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except Exception as e:
+            print(f"Error reading cached image: {e}")
+    return None
+
+def _image_cache_put(url, content):
+    path = _image_cache_path(url)
+    try:
+        # Write atomically so an interrupted run can't leave a torn file
+        with open(path + '.tmp', 'wb') as f:
+            f.write(content)
+        os.replace(path + '.tmp', path)
+    except Exception as e:
+        print(f"Error caching image: {e}")
+
+# Enhanced headers to bypass image host restrictions
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Referer': 'https://commons.wikimedia.org/',
+    'sec-ch-ua': '" Not A;Brand";v="99", "Chromium";v="91"',
+    'sec-ch-ua-mobile': '?0',
+    'Sec-Fetch-Dest': 'image',
+    'Sec-Fetch-Mode': 'no-cors',
+    'Sec-Fetch-Site': 'cross-site',
+}
+
+# Pooled session for the sequential download path: keep-alive avoids a fresh
+# TCP+TLS handshake per image (nearly all hit upload.wikimedia.org), and
+# urllib3 handles retries with backoff instead of a hand-rolled sleep loop
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32,
+                       max_retries=Retry(total=3, backoff_factor=2,
+                                         status_forcelist=[429, 500, 502, 503, 504],
+                                         allowed_methods=["GET"]))
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+
+# Query template kept as a constant so the cache key below stays stable
+SPARQL_QUERY_TEMPLATE = """
     SELECT DISTINCT ?artwork ?image ?date ?creationLocationLabel ?coords ?countryLabel
     WHERE {{
       # Only paintings
       ?artwork wdt:P31 wd:Q3305213.  # Q3305213: painting
-      
+
       # Created in a European country
       ?artwork wdt:P495 ?country.  # P495: country of origin
       ?country wdt:P30 wd:Q46.  # Q46: Europe
-      
+
       # Must have an image
       ?artwork wdt:P18 ?image.
-      
+
       # Creation date between specified years
       ?artwork wdt:P571 ?date.
       FILTER(YEAR(?date) >= {start_year} && YEAR(?date) <= {end_year})
-      
+
       # Creation location with coordinates
       ?artwork wdt:P1071 ?creationLocation.  # P1071: location of creation
       ?creationLocation wdt:P625 ?coords.  # P625: coordinate location
-      
+
       # Language services
       SERVICE wikibase:label {{ bd:serviceParam wikibase:language "en,tr". }}
     }}
     ORDER BY ?date
     LIMIT {limit}
+    OFFSET {offset}
     """
-    
+
+# WikiData round trips take seconds each and the bindings are deterministic
+# for a given query, so memoize them to disk with a TTL
+_SPARQL_CACHE_DIR = os.path.join('data', 'sparql_cache')
+os.makedirs(_SPARQL_CACHE_DIR, exist_ok=True)
+_SPARQL_CACHE_TTL = 7 * 86400  # a week; WikiData results drift slowly
+
+def sparql_cache(func):
+    """Memoize a query function's bindings to disk so reruns skip WikiData"""
+    def wrapper(*args, **kwargs):
+        parts = [str(a) for a in args] + [f"{k}={v}" for k, v in sorted(kwargs.items())]
+        key = hashlib.sha1("_".join(parts).encode()).hexdigest()
+        path = os.path.join(_SPARQL_CACHE_DIR, f"{key}.json")
+
+        if os.path.exists(path) and time.time() - os.path.getmtime(path) < _SPARQL_CACHE_TTL:
+            try:
+                with open(path) as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"Error reading SPARQL cache: {e}")
+
+        results = func(*args, **kwargs)
+        if results:
+            try:
+                with open(path, 'w') as f:
+                    json.dump(results, f)
+            except Exception as e:
+                print(f"Error writing SPARQL cache: {e}")
+        return results
+    return wrapper
+
+@sparql_cache
+def run_wikidata_query(start_year, end_year, limit=100, offset=0):
+    """Run a SPARQL query on WikiData to get European painting data with geospatial information"""
+    sparql = SPARQLWrapper("https://query.wikidata.org/sparql")
+
+    query = SPARQL_QUERY_TEMPLATE.format(start_year=start_year, end_year=end_year,
+                                         limit=limit, offset=offset)
+
     sparql.setQuery(query)
     sparql.setReturnFormat(JSON)
     
     try:
-        results = sparql.query().convert()
+        if orjson is not None:
+            # Decode the raw response bytes with orjson - several times
+            # faster than the stdlib json parse .convert() does for the
+            # large bindings payloads WikiData returns
+            results = orjson.loads(sparql.query().response.read())
+        else:
+            results = sparql.query().convert()
         return results["results"]["bindings"]
     except Exception as e:
         print(f"Error running query for {start_year}-{end_year}: {e}")
         return []
 
+# WikiData typically returns: Point(longitude latitude)
+_PT_RE = re.compile(r'Point\(\s*([-\d.eE+]+)\s+([-\d.eE+]+)\s*\)')
+
+@functools.lru_cache(maxsize=4096)
 def extract_coordinates(coords_str):
     """Extract latitude and longitude from WikiData coordinate format"""
-    # WikiData typically returns: Point(longitude latitude)
+    # One precompiled C-level match instead of chained replace/split calls
+    # that each allocate an intermediate string
     try:
-        # Remove 'Point(' and ')'
-        coords_clean = coords_str.replace('Point(', '').replace(')', '')
-        
-        # Split into longitude and latitude
-        lon, lat = coords_clean.split()
-        return float(lat), float(lon)
+        m = _PT_RE.match(coords_str)
+        if m:
+            return float(m.group(2)), float(m.group(1))
     except Exception as e:
         print(f"Error extracting coordinates from {coords_str}: {e}")
-        return None, None
-
-def download_image(url, timeout=30, max_retries=3):
-    """Download image from URL with enhanced headers to bypass restrictions"""
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept': 'image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.9',
-        'Referer': 'https://commons.wikimedia.org/',
-        'sec-ch-ua': '" Not A;Brand";v="99", "Chromium";v="91"',
-        'sec-ch-ua-mobile': '?0',
-        'Sec-Fetch-Dest': 'image',
-        'Sec-Fetch-Mode': 'no-cors',
-        'Sec-Fetch-Site': 'cross-site',
-    }
-    
-    retries = 0
-    while retries < max_retries:
+    return None, None
+
+def to_thumb_url(url, width=512):
+    """Rewrite a Wikimedia original-file URL to a pre-sized thumbnail URL"""
+    # Originals are often 10-50 MB scans; for color statistics ~512px is
+    # plenty, so let Commons do the downscaling and ship 100-1000x less data
+    if 'wikimedia.org' in url or 'wikipedia.org' in url:
+        filename = url.split('/')[-1]
+        return f"https://commons.wikimedia.org/wiki/Special:FilePath/{filename}?width={width}"
+    return url
+
+def download_image(url, timeout=30):
+    """Download image bytes from URL (sequential fallback path)"""
+    try:
+        # Retries and backoff are handled by the session's adapter
+        response = SESSION.get(to_thumb_url(url), timeout=timeout)
+
+        if response.status_code == 200:
+            return response.content
+        print(f"Failed to download image: HTTP {response.status_code}")
+
+    except Exception as e:
+        print(f"Error downloading image: {e}")
+
+    print(f"Failed to download image: {url}")
+    return None
+
+class _MinIntervalLimiter:
+    """Fallback limiter when aiolimiter is missing: spaces request starts
+    at least 1/max_rate apart, so the rate cap holds without the library"""
+    def __init__(self, max_rate):
+        self._interval = 1.0 / max_rate
+        self._next_at = 0.0
+        self._lock = None  # created lazily inside the running loop
+
+    async def __aenter__(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_at - now
+            self._next_at = max(now, self._next_at) + self._interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def __aexit__(self, *exc):
+        return False
+
+async def _fetch(session, url, limiter, timeout=30):
+    """Fetch one image URL, returning its bytes or None"""
+    async with limiter:
         try:
-            # Try to download with enhanced headers
-            response = requests.get(url, headers=headers, timeout=timeout)
-            
-            if response.status_code == 200:
-                return Image.open(BytesIO(response.content))
-            else:
-                print(f"Failed to download image: HTTP {response.status_code}")
-                
-                # For Wikimedia Commons URLs, try to modify the URL to access a thumbnail
-                if 'wikimedia.org' in url or 'wikipedia.org' in url:
-                    try:
-                        # Extract the filename
-                        filename = url.split('/')[-1]
-                        # Create thumbnail URL
-                        thumbnail_url = f"https://commons.wikimedia.org/wiki/Special:FilePath/{filename}?width=800"
-                        print(f"Trying alternative thumbnail URL: {thumbnail_url}")
-                        
-                        response = requests.get(thumbnail_url, headers=headers, timeout=timeout)
-                        if response.status_code == 200:
-                            return Image.open(BytesIO(response.content))
-                        else:
-                            print(f"Failed to download thumbnail: HTTP {response.status_code}")
-                    except Exception as e:
-                        print(f"Error getting thumbnail: {e}")
-            
-            retries += 1
-            if retries < max_retries:
-                wait_time = 2 ** retries  # Exponential backoff
-                print(f"Retrying in {wait_time} seconds... (attempt {retries+1}/{max_retries})")
-                time.sleep(wait_time)
-            
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
+                if resp.status == 200:
+                    return await resp.read()
+                print(f"Failed to download image: HTTP {resp.status}")
         except Exception as e:
             print(f"Error downloading image: {e}")
-            retries += 1
-            if retries < max_retries:
-                wait_time = 2 ** retries
-                print(f"Retrying in {wait_time} seconds... (attempt {retries+1}/{max_retries})")
-                time.sleep(wait_time)
-    
-    print(f"Failed to download image after {max_retries} attempts")
     return None
 
+async def _fetch_all(urls):
+    """Download all URLs concurrently over one pooled session"""
+    # A token bucket at 5 req/s is the politeness throttle: concurrent
+    # downloads share the budget without serial sleeps blocking the loop.
+    # Without aiolimiter the minimal spacing limiter enforces the same cap.
+    if AsyncLimiter is not None:
+        limiter = AsyncLimiter(max_rate=5, time_period=1)
+    else:
+        limiter = _MinIntervalLimiter(max_rate=5)
+    connector = aiohttp.TCPConnector(limit=32, limit_per_host=4)
+    async with aiohttp.ClientSession(connector=connector, headers=HEADERS) as session:
+        tasks = [_fetch(session, to_thumb_url(url), limiter) for url in urls]
+        return await asyncio.gather(*tasks)
+
+def fetch_images(urls):
+    """Fetch image bytes for all URLs, concurrently when aiohttp is available"""
+    # Serve reruns from the on-disk cache and only hit the network for misses
+    results = [_image_cache_get(url) for url in urls]
+    missing = [i for i, content in enumerate(results) if content is None]
+
+    if missing:
+        miss_urls = [urls[i] for i in missing]
+        if aiohttp is not None:
+            fetched = asyncio.run(_fetch_all(miss_urls))
+        else:
+            print("aiohttp not available, downloading sequentially")
+            # Keep the same ~5 req/s politeness cap as the async path
+            fetched = []
+            last = 0.0
+            for url in miss_urls:
+                wait = 0.2 - (time.monotonic() - last)
+                if wait > 0:
+                    time.sleep(wait)
+                last = time.monotonic()
+                fetched.append(download_image(url))
+
+        for i, content in zip(missing, fetched):
+            if content is not None:
+                _image_cache_put(urls[i], content)
+            results[i] = content
+
+    return results
+
+def _color_stats(pixels):
+    """Color features from an (H, W, 3) uint8 pixel array"""
+    # One contiguous reduction over the whole buffer instead of three
+    # strided per-channel sums that each re-walk the pixel data
+    flat = pixels.reshape(-1, 3)
+    n = flat.shape[0]
+    sums = flat.sum(axis=0, dtype=np.int64)
+    total_color = int(sums.sum())
+
+    if total_color > 0:
+        red_pct, green_pct, blue_pct = sums / total_color
+    else:
+        red_pct = green_pct = blue_pct = 0.33
+
+    # Full 16-bin-per-channel histograms via bincount on right-shifted
+    # pixel values (256 -> 16 levels): the same O(N) traversal as the sum
+    # above but a much richer feature set for downstream analysis
+    idx = flat >> 4
+    r_hist = np.bincount(idx[:, 0], minlength=16) / n
+    g_hist = np.bincount(idx[:, 1], minlength=16) / n
+    b_hist = np.bincount(idx[:, 2], minlength=16) / n
+
+    mean = flat.mean(axis=0)
+    std = flat.std(axis=0)
+
+    return {
+        'red_pct': red_pct,
+        'green_pct': green_pct,
+        'blue_pct': blue_pct,
+        'mean': mean,
+        'std': std,
+        'r_hist': r_hist,
+        'g_hist': g_hist,
+        'b_hist': b_hist
+    }
+
 def analyze_image_colors(image):
     """Analyze the RGB color distribution in an image"""
     try:
+        # Downsample in place before the mode conversion - the aggregate
+        # color stats don't need LANCZOS fidelity, and bilinear at 512px is
+        # far less work than an 8-tap filter over the full resolution
+        image.thumbnail((512, 512), Image.Resampling.BILINEAR)
+
         # Convert to RGB if not already
         if image.mode != 'RGB':
             image = image.convert('RGB')
         
-        # Resize for faster processing if image is large
-        if max(image.size) > 1000:
-            ratio = 1000 / max(image.size)
-            new_size = (int(image.size[0] * ratio), int(image.size[1] * ratio))
-            image = image.resize(new_size, Image.LANCZOS)
-        
-        # Get pixel data as numpy array
-        pixels = np.array(image)
-        
-        # Calculate color percentages
-        total_pixels = pixels.shape[0] * pixels.shape[1]
-        red_sum = pixels[:,:,0].sum()
-        green_sum = pixels[:,:,1].sum()
-        blue_sum = pixels[:,:,2].sum()
-        
-        total_color = red_sum + green_sum + blue_sum
-        
-        # Calculate color percentages (normalized)
-        if total_color > 0:
-            red_pct = red_sum / total_color
-            green_pct = green_sum / total_color
-            blue_pct = blue_sum / total_color
-        else:
-            red_pct = green_pct = blue_pct = 0.33
-            
-        return {
-            'red_pct': red_pct,
-            'green_pct': green_pct,
-            'blue_pct': blue_pct
-        }
+        # Get pixel data as a numpy view - asarray can reuse PIL's buffer
+        # instead of memcpy'ing every image, and we never mutate the pixels
+        pixels = np.asarray(image, dtype=np.uint8)
+
+        return _color_stats(pixels)
     except Exception as e:
         print(f"Error analyzing image colors: {e}")
         return None
 
+def _decode_and_analyze(img_bytes):
+    """Decode image bytes and compute color stats (picklable pool worker)"""
+    if img_bytes is None:
+        return None
+    try:
+        # For JPEGs, libjpeg-turbo's IDCT-scaled decode emits a 1/8-size
+        # RGB array directly with SIMD, skipping 63/64 of the pixel work
+        if _turbojpeg is not None and img_bytes[:2] == b'\xff\xd8':
+            arr = _turbojpeg.decode(img_bytes, pixel_format=TJPF_RGB,
+                                    scaling_factor=(1, 8))
+            return _color_stats(arr)
+
+        image = Image.open(BytesIO(img_bytes))
+        # Draft mode asks libjpeg to decode at 1/2-1/8 of full resolution
+        # during the IDCT stage, so oversized inputs arrive near-target
+        # size for free; it's a no-op for non-JPEG formats
+        image.draft('RGB', (512, 512))
+        return analyze_image_colors(image)
+    except Exception as e:
+        print(f"Error decoding image: {e}")
+        return None
+
+def _v(res, key):
+    """Pull a binding's value without allocating fallback dicts"""
+    node = res.get(key)
+    return node['value'] if node else None
+
 def process_artwork_data(results, save_images=False):
     """Process artwork data from WikiData results"""
-    data = []
-    
-    for i, result in enumerate(results):
+    # First pass: parse and filter the rows so the download batch only
+    # contains artworks we can actually use
+    artworks = []
+    for result in results:
         try:
             # Extract data from result
-            image_url = result.get('image', {}).get('value')
-            date_str = result.get('date', {}).get('value')
-            coords_str = result.get('coords', {}).get('value')
-            location = result.get('creationLocationLabel', {}).get('value', 'Unknown')
-            country = result.get('countryLabel', {}).get('value', 'Unknown')
-            
+            image_url = _v(result, 'image')
+            date_str = _v(result, 'date')
+            coords_str = _v(result, 'coords')
+            location = _v(result, 'creationLocationLabel') or 'Unknown'
+            country = _v(result, 'countryLabel') or 'Unknown'
+
             # Skip if missing essential data
             if not image_url or not date_str or not coords_str:
                 print("Skipping artwork: Missing essential data")
                 continue
-                
-            # Extract year from date
-            year = datetime.strptime(date_str.split('T')[0], '%Y-%m-%d').year
-            
+
+            # Extract year from date - WikiData dates are ISO 8601, so the
+            # year is just the leading digits; slicing skips strptime's
+            # regex/locale machinery entirely (BC years carry a '-' sign)
+            year = int(date_str[:5] if date_str.startswith('-') else date_str[:4])
+
             # Extract coordinates
             latitude, longitude = extract_coordinates(coords_str)
             if latitude is None or longitude is None:
                 print("Skipping artwork: Could not extract coordinates")
                 continue
-            
-            print(f"Processing artwork {i+1}/{len(results)} from {year}: {location}, {country}")
-            
-            # Try to download and analyze the image
-            print(f"Downloading image: {image_url}")
-            image = download_image(image_url)
-            
-            if image is None:
+
+            artworks.append({
+                'year': year,
+                'location': location,
+                'country': country,
+                'latitude': latitude,
+                'longitude': longitude,
+                'image_url': image_url
+            })
+        except Exception as e:
+            print(f"Error processing result: {e}")
+            continue
+
+    if not artworks:
+        return
+
+    # Second pass: download every image concurrently - the workload is
+    # network-latency-bound, so saturating the connection beats waiting on
+    # one sequential request (plus a politeness sleep) per image
+    print(f"Downloading {len(artworks)} images...")
+    images_bytes = fetch_images([artwork['image_url'] for artwork in artworks])
+
+    # Third pass: decode and analyze on all cores - JPEG decode plus the
+    # NumPy reduction is CPU-bound, so fan out across processes
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        all_colors = list(executor.map(_decode_and_analyze, images_bytes, chunksize=8))
+
+    for i, (artwork, img_bytes, colors) in enumerate(zip(artworks, images_bytes, all_colors)):
+        try:
+            if img_bytes is None:
                 print(f"Skipping artwork: Could not download image")
                 continue
-                
-            # Analyze colors
-            colors = analyze_image_colors(image)
+
+            print(f"Processing artwork {i+1}/{len(artworks)} from {artwork['year']}: {artwork['location']}, {artwork['country']}")
+
             if colors is None:
                 print(f"Skipping artwork: Could not analyze colors")
                 continue
-                
+
             print(f"Image analyzed successfully")
-            
+
             # Save image if requested
             if save_images:
                 # Create a safe filename from the URL
-                filename = os.path.basename(urlparse(image_url).path)
+                filename = os.path.basename(urlparse(artwork['image_url']).path)
                 if not filename:
-                    filename = f"artwork_{year}_{i}.jpg"
-                
+                    filename = f"artwork_{artwork['year']}_{i}.jpg"
+
                 save_path = os.path.join('images', filename)
                 try:
-                    image.save(save_path)
+                    Image.open(BytesIO(img_bytes)).save(save_path)
                     print(f"Image saved to {save_path}")
                 except Exception as e:
                     print(f"Error saving image: {e}")
-            
-            # Add to data
-            artwork_data = {
-                'year': year,
-                'location': location,
-                'country': country,
-                'latitude': latitude,
-                'longitude': longitude,
+
+            # Hand the finished record to the caller as soon as it's ready
+            yield {
+                'year': artwork['year'],
+                'location': artwork['location'],
+                'country': artwork['country'],
+                'latitude': artwork['latitude'],
+                'longitude': artwork['longitude'],
                 'red_pct': colors['red_pct'],
                 'green_pct': colors['green_pct'],
                 'blue_pct': colors['blue_pct'],
-                'image_url': image_url
+                'red_mean': colors['mean'][0],
+                'green_mean': colors['mean'][1],
+                'blue_mean': colors['mean'][2],
+                'red_std': colors['std'][0],
+                'green_std': colors['std'][1],
+                'blue_std': colors['std'][2],
+                # Histograms go into the CSV as space-separated columns so
+                # the row stays flat and easy to parse back with np.fromstring
+                'r_hist': ' '.join(f'{v:.4f}' for v in colors['r_hist']),
+                'g_hist': ' '.join(f'{v:.4f}' for v in colors['g_hist']),
+                'b_hist': ' '.join(f'{v:.4f}' for v in colors['b_hist']),
+                'image_url': artwork['image_url']
             }
-            
-            data.append(artwork_data)
-            
-            # Be nice to the server
-            time.sleep(random.uniform(1, 3))
-            
+
         except Exception as e:
             print(f"Error processing result: {e}")
             continue
-    
-    return data
+
+CSV_FIELDS = ['year', 'location', 'country', 'latitude', 'longitude',
+              'red_pct', 'green_pct', 'blue_pct',
+              'red_mean', 'green_mean', 'blue_mean',
+              'red_std', 'green_std', 'blue_std',
+              'r_hist', 'g_hist', 'b_hist', 'image_url']
+
+# Columnar, typed schema for the Parquet sink; the three *_hist columns
+# stay as the same space-separated strings the CSV uses
+PARQUET_SCHEMA = None
+if pa is not None:
+    PARQUET_SCHEMA = pa.schema(
+        [('year', pa.int32()), ('location', pa.string()), ('country', pa.string())]
+        + [(name, pa.float64()) for name in CSV_FIELDS[3:14]]
+        + [('r_hist', pa.string()), ('g_hist', pa.string()),
+           ('b_hist', pa.string()), ('image_url', pa.string())])
 
 def main():
-    all_data = []
+    total = 0
     save_path = os.path.join('data', 'european_paintings_color_data.csv')
-    
-    # Process data in 10-year chunks to avoid timeout
-    decades = [(decade, decade+9) for decade in range(1900, 2001, 10)]
-    
-    for start_year, end_year in decades:
-        print(f"\n=== Querying data for {start_year}-{end_year} ===")
-        results = run_wikidata_query(start_year, end_year, limit=50)
-        
-        if results:
-            print(f"Found {len(results)} results for {start_year}-{end_year}")
-            decade_data = process_artwork_data(results, save_images=False)
-            
-            if decade_data:
-                all_data.extend(decade_data)
-                
-                # Save intermediate results
-                df = pd.DataFrame(all_data)
-                df.to_csv(save_path, index=False)
-                print(f"Saved {len(all_data)} records to {save_path}")
+    parquet_path = os.path.join('data', 'european_paintings_color_data.parquet')
+
+    # Stream the same records into an appendable Parquet file when pyarrow
+    # is around - typed and columnar, so downstream reads skip CSV parsing
+    parquet_writer = None
+    if pa is not None:
+        parquet_writer = pq.ParquetWriter(parquet_path, PARQUET_SCHEMA)
+
+    # One ranged query over the whole period, paged server-side, instead of
+    # 11 per-decade queries that each pay DNS/TLS/queue latency plus a
+    # forced 5-10s politeness sleep
+    start_year, end_year, page_size = 1900, 2009, 50
+
+    # Stream each record to the CSV exactly once - the old per-page
+    # pd.DataFrame(all_data).to_csv rewrote the whole growing file every
+    # time, O(N^2) in total records
+    with open(save_path, 'w', newline='') as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+
+        for offset in range(0, 550, page_size):
+            print(f"\n=== Querying artworks {offset}-{offset + page_size} for {start_year}-{end_year} ===")
+            query_start = time.time()
+            results = run_wikidata_query(start_year, end_year, limit=page_size, offset=offset)
+
+            if not results:
+                print(f"No more results at offset {offset}")
+                break
+
+            print(f"Found {len(results)} results at offset {offset}")
+            page_records = []
+            for record in process_artwork_data(results, save_images=False):
+                writer.writerow(record)
+                page_records.append(record)
+            csv_file.flush()  # keep everything written so far crash-safe
+            page_count = len(page_records)
+
+            # Append this page as one row group - no rereading or rewriting
+            # of what's already on disk
+            if parquet_writer is not None and page_records:
+                try:
+                    parquet_writer.write_table(
+                        pa.Table.from_pylist(page_records, schema=PARQUET_SCHEMA))
+                except Exception as e:
+                    print(f"Error writing Parquet page: {e}")
+
+            if page_count:
+                total += page_count
+                print(f"Saved {total} records to {save_path}")
             else:
-                print(f"No valid data processed for {start_year}-{end_year}")
-        else:
-            print(f"No results found for {start_year}-{end_year}")
-        
-        # Be extra nice to the server between decade queries
-        time.sleep(random.uniform(5, 10))
-    
-    # Final save
-    if all_data:
-        df = pd.DataFrame(all_data)
-        df.to_csv(save_path, index=False)
-        print(f"Completed! Total of {len(all_data)} records saved to {save_path}")
+                print(f"No valid data processed at offset {offset}")
+
+            # A short pause between pages when we actually hit the endpoint;
+            # cache hits return near-instantly
+            if time.time() - query_start > 0.5:
+                time.sleep(2)
+
+    if parquet_writer is not None:
+        parquet_writer.close()
+        print(f"Parquet copy saved to {parquet_path}")
+
+    if total:
+        print(f"Completed! Total of {total} records saved to {save_path}")
     else:
         print("No data was collected.")
 